@@ -10,6 +10,22 @@ import shutil
 from pathlib import Path
 
 
+def compile_kernels():
+    """Ahead-of-time compile the Numba kernels shipped with the executable"""
+    print("⚙️  Compiling kernels...")
+    
+    try:
+        subprocess.run([sys.executable, "compile_kernels.py"], check=True,
+                       capture_output=True, text=True)
+    except subprocess.CalledProcessError as e:
+        # The app falls back to JIT or OpenCV, so this is not fatal
+        print(f"⚠️  Kernel compilation failed, continuing without it: {e}")
+        print(f"Error output: {e.stderr}")
+        return []
+        
+    return sorted(Path(".").glob("vivi_kernels*.pyd")) + sorted(Path(".").glob("vivi_kernels*.so"))
+
+
 def build_executable():
     """Build the Windows executable using PyInstaller"""
     
@@ -17,6 +33,9 @@ def build_executable():
     project_dir = Path(__file__).parent
     os.chdir(project_dir)
     
+    # Compile kernels before packaging
+    kernels = compile_kernels()
+    
     print("🔨 Building Vivi executable...")
     
     # PyInstaller command
@@ -27,8 +46,10 @@ def build_executable():
         "--name", "Vivi",
         "--icon", "assets/icon.ico",  # Will create this later
         "--add-data", "src;src",  # Include source code
-        "src/main.py"
     ]
+    for kernel in kernels:
+        cmd += ["--add-binary", f"{kernel};."]  # Precompiled kernels
+    cmd.append("src/main.py")
     
     try:
         # Run PyInstaller
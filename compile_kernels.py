@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Ahead-of-time compilation of Vivi's Numba kernels
+
+Builds the vivi_kernels extension module next to this script so the
+packaged executable does not pay the JIT compile cost on the first frame.
+"""
+
+import sys
+from pathlib import Path
+
+from numba.pycc import CC
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.core.monitors.screen_monitor import _screen_stats
+
+
+def compile_kernels() -> Path:
+    """Compile the kernels and return the output directory"""
+    output_dir = Path(__file__).parent
+    
+    cc = CC('vivi_kernels')
+    cc.output_dir = str(output_dir)
+    
+    # Same source as the JIT kernels, compiled for a fixed signature
+    cc.export('screen_stats', 'UniTuple(float64, 2)(uint8[:, :, :], uint8[:, :])')(
+        _screen_stats.py_func
+    )
+    
+    cc.compile()
+    return output_dir
+
+
+def main():
+    """Compile kernels from the command line"""
+    print("⚙️  Compiling Vivi kernels...")
+    output_dir = compile_kernels()
+    print(f"✅ Kernels compiled into {output_dir}")
+
+
+if __name__ == "__main__":
+    main()
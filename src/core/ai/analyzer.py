@@ -2,9 +2,146 @@
 Behavior analysis module using AI
 """
 
+import logging
+import re
+import sys
 import time
-from typing import Dict, Any, List
+from bisect import bisect_right
+from typing import Dict, Any, List, Iterable, Tuple
 import numpy as np
+from ..frame import MonitorFrame
+
+# Try to import the Aho-Corasick automaton for keyword scanning
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+# Try to import Numba for the focus scoring kernel
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+log = logging.getLogger(__name__)
+log.addHandler(logging.NullHandler())
+
+
+# Focus score weights for the features listed by _focus_features:
+# productivity, input, screen changing, distraction, dark screen, static screen
+_FOCUS_WEIGHTS = np.array([0.3, 0.2, 0.1, -0.4, -0.2, -0.1])
+_FOCUS_WEIGHT_VALUES = tuple(_FOCUS_WEIGHTS.tolist())
+
+# Mean gray level below which the screen counts as dark (might be sleeping)
+_DARK_BRIGHTNESS = 50
+
+# A frozen app has no kernel source on disk for Numba to cache against
+_NUMBA_CACHE = not getattr(sys, 'frozen', False)
+
+if NUMBA_AVAILABLE:
+    # The explicit signature compiles the kernel eagerly at import, or loads
+    # it from the on-disk cache, instead of on the first call
+    @njit("float64[:](float64[:, :], float64[:])", cache=_NUMBA_CACHE)
+    def _focus_scores(features, weights):
+        """Focus scores from 0.0 to 1.0 for each row of features"""
+        scores = np.empty(features.shape[0])
+        for i in range(features.shape[0]):
+            # Summed in feature order, so results match adding each
+            # active factor in turn bit for bit at the 0.2/0.3 thresholds
+            score = 0.5
+            for j in range(features.shape[1]):
+                score += features[i, j] * weights[j]
+            scores[i] = min(1.0, max(0.0, score))
+        return scores
+else:
+    def _focus_scores(features, weights):
+        """Focus scores from 0.0 to 1.0 for each row of features"""
+        # Column by column rather than features @ weights, which may
+        # reorder the sum and change results at the thresholds
+        scores = np.full(features.shape[0], 0.5)
+        for j in range(weights.size):
+            scores += features[:, j] * weights[j]
+        return np.clip(scores, 0.0, 1.0)
+
+
+def _focus_features(productivity, input_active, screen_static, distraction,
+                    screen_dark) -> Tuple:
+    """Focus score features in _FOCUS_WEIGHTS order
+    
+    Takes booleans for a single frame or equal-length boolean arrays for a
+    batch, and returns features of the same kind.
+    """
+    # ^ True negates a bool and a boolean array alike
+    return (productivity, input_active, screen_static ^ True, distraction,
+            screen_dark, screen_static)
+
+
+# Splits lowercased names and titles into alphanumeric tokens
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Input event types counted as typing
+_KEY_EVENTS = frozenset({'key_press', 'key_release'})
+_KEY_EVENT_NAMES = np.array(sorted(_KEY_EVENTS))
+
+
+class _KeywordMatcher:
+    """Matches a fixed set of keywords against lowercased text
+    
+    Whole-token hits are found with a set lookup, names without one are
+    scanned for keywords inside tokens (e.g. "youtubedl") in a single pass.
+    """
+    
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = tuple(keywords)
+        self._keyword_set = frozenset(self.keywords)
+        
+        # Single alternation, used when the automaton is missing
+        self._pattern = re.compile("|".join(map(re.escape, self.keywords)))
+        
+        # Build the automaton once so each scan is linear in the text length
+        if AHOCORASICK_AVAILABLE:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in self.keywords:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+        else:
+            self._automaton = None
+            
+    def search(self, text: str) -> bool:
+        """Return True if any keyword occurs in the lowercased text"""
+        if not self._keyword_set.isdisjoint(_TOKEN_RE.findall(text)):
+            return True
+        if self._automaton is not None:
+            return next(self._automaton.iter(text), None) is not None
+        return self._pattern.search(text) is not None
+        
+    def count_matching(self, names: List[str]) -> int:
+        """Count lowercased names containing at least one keyword"""
+        keyword_set = self._keyword_set
+        findall = _TOKEN_RE.findall
+        misses = [name for name in names if keyword_set.isdisjoint(findall(name))]
+        return len(names) - len(misses) + self._count_substring_matches(misses)
+        
+    def _count_substring_matches(self, names: List[str]) -> int:
+        """Count names containing a keyword anywhere, tokens or not"""
+        if not names:
+            return 0
+        if self._automaton is None:
+            search = self._pattern.search
+            return sum(1 for name in names if search(name))
+            
+        # Scan all names joined by a separator in a single pass and map
+        # each match back to the name it ended in
+        blob = "\x00".join(names)
+        starts = [0]
+        separator = blob.find("\x00")
+        while separator != -1:
+            starts.append(separator + 1)
+            separator = blob.find("\x00", separator + 1)
+        matched = {bisect_right(starts, end) - 1 for end, _ in self._automaton.iter(blob)}
+        return len(matched)
 
 
 class BehaviorAnalyzer:
@@ -19,8 +156,13 @@ class BehaviorAnalyzer:
             'code', 'programming', 'work', 'document', 'email', 
             'meeting', 'project', 'task', 'development'
         ]
+        self._distraction_matcher = _KeywordMatcher(self.distraction_keywords)
+        self._productivity_matcher = _KeywordMatcher(self.productivity_keywords)
         
-    def analyze(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        # Lowercased process names by PID, names are stable for a PID's lifetime
+        self._lowered_names: Dict[int, Tuple[str, str]] = {}
+        
+    def analyze(self, data: MonitorFrame) -> Dict[str, Any]:
         """Analyze collected data and return insights"""
         analysis = {
             'timestamp': time.time(),
@@ -31,31 +173,33 @@ class BehaviorAnalyzer:
             'recommendations': []
         }
         
+        screen = data.screen
+        processes = data.processes
+        window = data.window
+        input_data = data.input
+        
         # Analyze screen data
-        if 'screen' in data and data['screen']:
-            screen_analysis = self._analyze_screen_data(data['screen'])
-            analysis.update(screen_analysis)
+        if screen:
+            analysis.update(self._analyze_screen_data(screen))
             
         # Analyze process data
-        if 'processes' in data:
-            process_analysis = self._analyze_process_data(data['processes'])
-            analysis.update(process_analysis)
+        if processes is not None:
+            analysis.update(self._analyze_process_data(processes))
             
         # Analyze window data
-        if 'window' in data and data['window']:
-            window_analysis = self._analyze_window_data(data['window'])
-            analysis.update(window_analysis)
+        if window:
+            analysis.update(self._analyze_window_data(window))
             
         # Analyze input data
-        if 'input' in data:
-            input_analysis = self._analyze_input_data(data['input'])
-            analysis.update(input_analysis)
+        if input_data is not None:
+            analysis.update(self._analyze_input_data(input_data))
             
         # Calculate overall focus score
-        analysis['focus_score'] = self._calculate_focus_score(analysis)
+        focus_score = self._calculate_focus_score(analysis)
+        analysis['focus_score'] = focus_score
         
         # Determine if feedback is needed
-        analysis['needs_feedback'] = self._should_provide_feedback(analysis)
+        analysis['needs_feedback'] = self._should_provide_feedback(analysis, focus_score)
         
         return analysis
         
@@ -68,7 +212,7 @@ class BehaviorAnalyzer:
         
         # Detect if screen is too dark (might be sleeping)
         brightness = analysis.get('brightness', 128)
-        is_dark = brightness < 50
+        is_dark = brightness < _DARK_BRIGHTNESS
         
         return {
             'screen_static': is_static,
@@ -78,15 +222,13 @@ class BehaviorAnalyzer:
         
     def _analyze_process_data(self, processes: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Analyze running processes"""
-        process_names = [p['name'].lower() for p in processes]
+        process_names = self._lowered_process_names(processes)
         
         # Count distraction processes
-        distraction_count = sum(1 for name in process_names 
-                              if any(keyword in name for keyword in self.distraction_keywords))
+        distraction_count = self._distraction_matcher.count_matching(process_names)
         
         # Count productivity processes
-        productivity_count = sum(1 for name in process_names 
-                               if any(keyword in name for keyword in self.productivity_keywords))
+        productivity_count = self._productivity_matcher.count_matching(process_names)
         
         return {
             'distraction_processes': distraction_count,
@@ -94,18 +236,39 @@ class BehaviorAnalyzer:
             'total_processes': len(processes)
         }
         
+    def _lowered_process_names(self, processes: List[Dict[str, Any]]) -> List[str]:
+        """Lowercased process names, reusing the cached value per PID"""
+        cache = self._lowered_names
+        names = []
+        for p in processes:
+            pid = p['pid']
+            name = p['name']
+            entry = cache.get(pid)
+            # A reused PID may belong to a different process
+            if entry is None or entry[0] != name:
+                entry = cache[pid] = (name, name.lower())
+            names.append(entry[1])
+            
+        # Drop exited processes once the cache outgrows the process table
+        if len(cache) > 2 * len(processes):
+            self._lowered_names = {p['pid']: cache[p['pid']] for p in processes}
+            
+        return names
+        
     def _analyze_window_data(self, window_data: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze active window data"""
         window_title = window_data.get('title', '').lower()
         process_name = window_data.get('process_name', '').lower()
         
+        # Scan title and process name together, the separator keeps
+        # keywords from matching across the boundary
+        text = window_title + '\x00' + process_name
+        
         # Check for distraction indicators
-        distraction_detected = any(keyword in window_title or keyword in process_name 
-                                 for keyword in self.distraction_keywords)
+        distraction_detected = self._distraction_matcher.search(text)
         
         # Check for productivity indicators
-        productivity_detected = any(keyword in window_title or keyword in process_name 
-                                  for keyword in self.productivity_keywords)
+        productivity_detected = self._productivity_matcher.search(text)
         
         return {
             'distraction_detected': distraction_detected,
@@ -114,74 +277,117 @@ class BehaviorAnalyzer:
             'active_process': process_name
         }
         
-    def _analyze_input_data(self, input_data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Analyze input patterns"""
-        if not input_data:
+    def _analyze_input_data(self, input_data) -> Dict[str, Any]:
+        """Analyze input patterns
+        
+        Accepts the (key_count, mouse_count, total, seconds) counts from
+        InputMonitor.get_counts(), a dict of parallel 'types', 'descriptions'
+        and 'timestamps' arrays, or a list of input event dicts.
+        """
+        if isinstance(input_data, tuple):
+            # Pre-aggregated counts over a known window
+            key_count, _, total_events, seconds = input_data
+            time_span = seconds
+        elif isinstance(input_data, dict):
+            # Struct of arrays, counted without touching each event
+            timestamps = input_data['timestamps']
+            total_events = len(timestamps)
+            key_count = int(np.isin(input_data['types'], _KEY_EVENT_NAMES).sum())
+            time_span = float(timestamps[-1] - timestamps[0]) if total_events > 1 else 1
+        else:
+            key_count = sum(1 for e in input_data if e['type'] in _KEY_EVENTS)
+            total_events = len(input_data)
+            time_span = input_data[-1]['timestamp'] - input_data[0]['timestamp'] if total_events > 1 else 1
+            
+        if not total_events:
             return {'input_active': False, 'typing_rate': 0.0}
             
         # Calculate typing rate
-        key_events = [e for e in input_data if e['type'] in ['key_press', 'key_release']]
-        time_span = input_data[-1]['timestamp'] - input_data[0]['timestamp'] if len(input_data) > 1 else 1
-        typing_rate = len(key_events) / max(time_span, 1)
+        typing_rate = key_count / max(time_span, 1)
         
         # Detect rapid typing (might indicate stress or urgency)
         rapid_typing = typing_rate > 5.0
         
         return {
-            'input_active': len(input_data) > 0,
+            'input_active': True,
             'typing_rate': typing_rate,
             'rapid_typing': rapid_typing,
-            'total_input_events': len(input_data)
+            'total_input_events': total_events
         }
         
     def _calculate_focus_score(self, analysis: Dict[str, Any]) -> float:
         """Calculate a focus score from 0.0 to 1.0"""
-        score = 0.5  # Start with neutral score
-        
-        # Positive factors
-        if analysis.get('productivity_detected'):
-            score += 0.3
-        if analysis.get('input_active'):
-            score += 0.2
-        if not analysis.get('screen_static'):
-            score += 0.1
-            
-        # Negative factors
-        if analysis.get('distraction_detected'):
-            score -= 0.4
-        if analysis.get('screen_dark'):
-            score -= 0.2
-        if analysis.get('screen_static'):
-            score -= 0.1
+        get = analysis.get
+        productivity, inputs, changing, distraction, dark, static = _FOCUS_WEIGHT_VALUES
+        screen_static = get('screen_static')
+        
+        # Weighted sum around a neutral score. Terms are added in the
+        # _focus_features order, so thresholds match _focus_scores exactly
+        score = 0.5
+        if get('productivity_detected'):
+            score += productivity
+        if get('input_active'):
+            score += inputs
+        if not screen_static:
+            score += changing
+        if get('distraction_detected'):
+            score += distraction
+        if get('screen_dark'):
+            score += dark
+        if screen_static:
+            score += static
             
         # Normalize to 0.0-1.0 range
         return max(0.0, min(1.0, score))
         
-    def _should_provide_feedback(self, analysis: Dict[str, Any]) -> bool:
+    def analyze_batch(self, brightness: np.ndarray, change_detected: np.ndarray,
+                      productivity: np.ndarray, distraction: np.ndarray,
+                      input_active: np.ndarray) -> np.ndarray:
+        """Focus scores for a batch of frames given as equal-length arrays
+        
+        Uses the same features and thresholds as analyze(), scoring all
+        frames in a single kernel call.
+        """
+        features = np.column_stack(_focus_features(
+            productivity,
+            input_active,
+            ~np.asarray(change_detected, dtype=bool),
+            distraction,
+            np.asarray(brightness) < _DARK_BRIGHTNESS
+        )).astype(np.float64)
+        return _focus_scores(features, _FOCUS_WEIGHTS)
+        
+    def _warmup(self):
+        """Run the focus scoring kernel once so no compile lands on a tick"""
+        _focus_scores(np.zeros((0, _FOCUS_WEIGHTS.size)), _FOCUS_WEIGHTS)
+        
+    def _should_provide_feedback(self, analysis: Dict[str, Any], focus_score: float) -> bool:
         """Determine if feedback should be provided"""
-        # Debug: Print analysis results
-        print(f"Analysis results: {analysis}")
+        # Debug: Log analysis results
+        log.debug("Analysis results: %r", analysis)
+        
+        input_active = analysis.get('input_active')
         
         # Provide feedback for low focus score
-        if analysis.get('focus_score', 0.5) < 0.3:
-            print("Triggering feedback: Low focus score")
+        if focus_score < 0.3:
+            log.debug("Triggering feedback: Low focus score")
             return True
             
         # Provide feedback for distraction detection
         if analysis.get('distraction_detected'):
-            print("Triggering feedback: Distraction detected")
+            log.debug("Triggering feedback: Distraction detected")
             return True
             
         # Provide feedback for extended inactivity
-        if analysis.get('screen_static') and not analysis.get('input_active'):
-            print("Triggering feedback: Extended inactivity")
+        if analysis.get('screen_static') and not input_active:
+            log.debug("Triggering feedback: Extended inactivity")
             return True
             
         # Provide feedback for high activity (testing)
-        if analysis.get('input_active') and analysis.get('typing_rate', 0) > 0:
-            print("Triggering feedback: High activity detected")
+        if input_active and analysis.get('typing_rate', 0) > 0:
+            log.debug("Triggering feedback: High activity detected")
             return True
             
-        print("No feedback triggered")
+        log.debug("No feedback triggered")
         return False
 
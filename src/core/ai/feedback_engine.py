@@ -3,16 +3,68 @@ Feedback generation and delivery module
 """
 
 import time
+from collections import deque
+from itertools import islice
 from typing import Dict, Any, List
 import random
 
+# Feedback types, indexes into _TYPE_NAMES and _MESSAGES
+(DISTRACTION_ALERT, FOCUS_REMINDER, INACTIVITY_REMINDER,
+ STRESS_ALERT, GENERAL_ENCOURAGEMENT) = range(5)
+
+_TYPE_NAMES = (
+    'distraction_alert',
+    'focus_reminder',
+    'inactivity_reminder',
+    'stress_alert',
+    'general_encouragement'
+)
+
+_MESSAGES = (
+    # distraction_alert
+    (
+        "🚨 Focus alert! I noticed you're on a potentially distracting site.",
+        "⏰ Time to get back to work! You've got important tasks to complete.",
+        "🎯 Stay focused! Your productivity goals are waiting for you.",
+        "💪 Let's refocus on your tasks. You've got this!"
+    ),
+    # focus_reminder
+    (
+        "🌟 Your focus score is low. Let's get back on track!",
+        "📚 Time to dive deep into your work. Focus mode activated!",
+        "🎯 Remember your goals. Every moment counts!",
+        "💡 Take a deep breath and refocus on what matters most."
+    ),
+    # inactivity_reminder
+    (
+        "🤔 I notice you haven't been active. Are you still working?",
+        "⏸️ Taking a break? That's fine, just remember to come back!",
+        "💭 Lost in thought? Don't forget about your tasks!",
+        "🔄 Ready to get back to work? Your tasks are waiting."
+    ),
+    # stress_alert
+    (
+        "😌 Slow down a bit. Rapid typing might indicate stress.",
+        "🧘 Take a moment to breathe. You're doing great!",
+        "⏱️ Pace yourself. Quality over speed!",
+        "💆‍♀️ Remember to take breaks. Your well-being matters."
+    ),
+    # general_encouragement
+    (
+        "👍 Great job staying focused! Keep it up!",
+        "🎉 You're doing well! Stay on track!",
+        "⭐ Excellent work! You're making progress!",
+        "🚀 Keep the momentum going! You're on fire!"
+    )
+)
+
 
 class FeedbackEngine:
     """Generates and delivers feedback to the user"""
     
     def __init__(self):
-        self.feedback_history = []
         self.max_history = 100
+        self.feedback_history = deque(maxlen=self.max_history)
         
     def generate_feedback(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
         """Generate appropriate feedback based on analysis"""
@@ -21,85 +73,52 @@ class FeedbackEngine:
         priority = self._determine_priority(analysis)
         
         feedback = {
-            'type': feedback_type,
+            'type': _TYPE_NAMES[feedback_type],
             'message': message,
             'priority': priority,
             'timestamp': time.time(),
             'analysis': analysis
         }
         
-        # Store in history
+        # Store in history, the deque drops the oldest entry
         self.feedback_history.append(feedback)
-        if len(self.feedback_history) > self.max_history:
-            self.feedback_history.pop(0)
             
         return feedback
         
-    def _determine_feedback_type(self, analysis: Dict[str, Any]) -> str:
+    def _determine_feedback_type(self, analysis: Dict[str, Any]) -> int:
         """Determine the type of feedback needed"""
-        if analysis.get('distraction_detected'):
-            return 'distraction_alert'
-        elif analysis.get('focus_score', 0.5) < 0.3:
-            return 'focus_reminder'
-        elif analysis.get('screen_static') and not analysis.get('input_active'):
-            return 'inactivity_reminder'
-        elif analysis.get('rapid_typing'):
-            return 'stress_alert'
+        get = analysis.get
+        if get('distraction_detected'):
+            return DISTRACTION_ALERT
+        elif get('focus_score', 0.5) < 0.3:
+            return FOCUS_REMINDER
+        elif get('screen_static') and not get('input_active'):
+            return INACTIVITY_REMINDER
+        elif get('rapid_typing'):
+            return STRESS_ALERT
         else:
-            return 'general_encouragement'
+            return GENERAL_ENCOURAGEMENT
             
-    def _generate_message(self, feedback_type: str, analysis: Dict[str, Any]) -> str:
+    def _generate_message(self, feedback_type: int, analysis: Dict[str, Any]) -> str:
         """Generate appropriate message for feedback type"""
-        messages = {
-            'distraction_alert': [
-                "🚨 Focus alert! I noticed you're on a potentially distracting site.",
-                "⏰ Time to get back to work! You've got important tasks to complete.",
-                "🎯 Stay focused! Your productivity goals are waiting for you.",
-                "💪 Let's refocus on your tasks. You've got this!"
-            ],
-            'focus_reminder': [
-                "🌟 Your focus score is low. Let's get back on track!",
-                "📚 Time to dive deep into your work. Focus mode activated!",
-                "🎯 Remember your goals. Every moment counts!",
-                "💡 Take a deep breath and refocus on what matters most."
-            ],
-            'inactivity_reminder': [
-                "🤔 I notice you haven't been active. Are you still working?",
-                "⏸️ Taking a break? That's fine, just remember to come back!",
-                "💭 Lost in thought? Don't forget about your tasks!",
-                "🔄 Ready to get back to work? Your tasks are waiting."
-            ],
-            'stress_alert': [
-                "😌 Slow down a bit. Rapid typing might indicate stress.",
-                "🧘 Take a moment to breathe. You're doing great!",
-                "⏱️ Pace yourself. Quality over speed!",
-                "💆‍♀️ Remember to take breaks. Your well-being matters."
-            ],
-            'general_encouragement': [
-                "👍 Great job staying focused! Keep it up!",
-                "🎉 You're doing well! Stay on track!",
-                "⭐ Excellent work! You're making progress!",
-                "🚀 Keep the momentum going! You're on fire!"
-            ]
-        }
-        
-        message_list = messages.get(feedback_type, messages['general_encouragement'])
-        return random.choice(message_list)
+        messages = _MESSAGES[feedback_type]
+        return messages[random.randrange(len(messages))]
         
     def _determine_priority(self, analysis: Dict[str, Any]) -> str:
         """Determine feedback priority"""
-        if analysis.get('distraction_detected'):
-            return 'high'
-        elif analysis.get('focus_score', 0.5) < 0.2:
+        get = analysis.get
+        if get('distraction_detected') or get('focus_score', 0.5) < 0.2:
             return 'high'
-        elif analysis.get('rapid_typing'):
+        elif get('rapid_typing'):
             return 'medium'
         else:
             return 'low'
             
     def get_feedback_history(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent feedback history"""
-        return self.feedback_history[-limit:] if self.feedback_history else []
+        recent = list(islice(reversed(self.feedback_history), limit))
+        recent.reverse()
+        return recent
         
     def get_feedback_stats(self) -> Dict[str, Any]:
         """Get feedback statistics"""
@@ -0,0 +1,28 @@
+"""
+Monitor data passed from the engine to the analyzer
+"""
+
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, NamedTuple
+
+
+class InputCounts(NamedTuple):
+    """Input event counts over a time window"""
+    key_count: int
+    mouse_count: int
+    total: int
+    seconds: float
+
+
+@dataclass
+class MonitorFrame:
+    """Data collected from all monitors in one main loop tick"""
+
+    # Fixed slots instead of a per-instance __dict__
+    __slots__ = ("screen", "processes", "window", "input", "timestamp")
+
+    screen: Optional[Dict[str, Any]]
+    processes: Optional[List[Dict[str, Any]]]
+    window: Optional[Dict[str, Any]]
+    input: Any
+    timestamp: float
@@ -2,12 +2,19 @@
 Keyboard and mouse input monitoring module
 """
 
+import threading
 import time
-from typing import List, Dict, Any
-from collections import deque
+from typing import List, Dict, Any, Optional
+import numpy as np
 from pynput import keyboard, mouse
 from pynput.keyboard import Key, Listener as KeyboardListener
 from pynput.mouse import Listener as MouseListener
+from ..frame import InputCounts
+
+# Event type codes stored in the history ring, indexes into EVENT_TYPES
+KEY_PRESS, KEY_RELEASE, MOUSE_PRESS, MOUSE_RELEASE, MOUSE_SCROLL, MOUSE_MOVE = range(6)
+EVENT_TYPES = ('key_press', 'key_release', 'mouse_press', 'mouse_release',
+               'mouse_scroll', 'mouse_move')
 
 
 class InputMonitor:
@@ -15,11 +22,26 @@ class InputMonitor:
     
     def __init__(self, max_history: int = 1000):
         self.max_history = max_history
-        self.input_history = deque(maxlen=max_history)
+        
+        # Input history as a ring of parallel arrays, the next event is
+        # written at _head. Descriptions are only formatted when read
+        self._timestamps = np.zeros(max_history, dtype=np.float64)
+        self._types = np.zeros(max_history, dtype=np.uint8)
+        self._xs = np.zeros(max_history, dtype=np.int32)
+        self._ys = np.zeros(max_history, dtype=np.int32)
+        self._details = [None] * max_history
+        self._head = 0
+        self._count = 0
+        self._lock = threading.Lock()
+        
         self.keyboard_listener = None
         self.mouse_listener = None
         self.is_monitoring = False
         
+        # Position of the last logged mouse move
+        self._last_mouse_x = -10**9
+        self._last_mouse_y = -10**9
+        
     def start_monitoring(self):
         """Start monitoring input"""
         if self.is_monitoring:
@@ -58,7 +80,7 @@ class InputMonitor:
         """Handle key press events"""
         try:
             key_name = key.name if hasattr(key, 'name') else str(key)
-            self._add_input_event('key_press', key_name)
+            self._add_input_event(KEY_PRESS, key_name)
         except AttributeError:
             pass
             
@@ -66,71 +88,111 @@ class InputMonitor:
         """Handle key release events"""
         try:
             key_name = key.name if hasattr(key, 'name') else str(key)
-            self._add_input_event('key_release', key_name)
+            self._add_input_event(KEY_RELEASE, key_name)
         except AttributeError:
             pass
             
     def _on_mouse_click(self, x, y, button, pressed):
         """Handle mouse click events"""
-        action = 'mouse_press' if pressed else 'mouse_release'
-        self._add_input_event(action, f"{button.name} at ({x}, {y})")
+        action = MOUSE_PRESS if pressed else MOUSE_RELEASE
+        self._add_input_event(action, button.name, x, y)
         
     def _on_mouse_scroll(self, x, y, dx, dy):
         """Handle mouse scroll events"""
         direction = 'up' if dy > 0 else 'down'
-        self._add_input_event('mouse_scroll', f"{direction} at ({x}, {y})")
+        self._add_input_event(MOUSE_SCROLL, direction, x, y)
         
     def _on_mouse_move(self, x, y):
         """Handle mouse move events"""
-        # Only log significant movements to avoid spam
-        if len(self.input_history) == 0 or \
-           abs(x - self.input_history[-1].get('x', 0)) > 10 or \
-           abs(y - self.input_history[-1].get('y', 0)) > 10:
-            self._add_input_event('mouse_move', f"to ({x}, {y})", x=x, y=y)
+        # Only log movements of more than 10 pixels to avoid spam, this
+        # runs for every move event so it avoids touching the history
+        dx = x - self._last_mouse_x
+        dy = y - self._last_mouse_y
+        if dx * dx + dy * dy > 100:
+            self._last_mouse_x = x
+            self._last_mouse_y = y
+            self._add_input_event(MOUSE_MOVE, None, x, y)
             
-    def _add_input_event(self, event_type: str, description: str, **kwargs):
+    def _add_input_event(self, event_type: int, detail: Optional[str] = None, x: int = 0, y: int = 0):
         """Add input event to history"""
-        event = {
-            'type': event_type,
-            'description': description,
-            'timestamp': time.time(),
-            **kwargs
-        }
-        self.input_history.append(event)
+        with self._lock:
+            slot = self._head
+            self._timestamps[slot] = time.time()
+            self._types[slot] = event_type
+            self._xs[slot] = x
+            self._ys[slot] = y
+            self._details[slot] = detail
+            self._head = (slot + 1) % self.max_history
+            if self._count < self.max_history:
+                self._count += 1
+                
+    def _recent_slots(self, seconds: float) -> np.ndarray:
+        """Ring slots of events within the last seconds, oldest first.
+        Must be called with the lock held."""
+        slots = np.arange(self._head - self._count, self._head) % self.max_history
+        cutoff = np.searchsorted(self._timestamps[slots], time.time() - seconds)
+        return slots[cutoff:]
+        
+    def _describe(self, slot: int) -> str:
+        """Format the description of the event stored in slot"""
+        event_type = self._types[slot]
+        detail = self._details[slot]
+        if event_type <= KEY_RELEASE:
+            return detail
+        if event_type == MOUSE_MOVE:
+            return f"to ({self._xs[slot]}, {self._ys[slot]})"
+        return f"{detail} at ({self._xs[slot]}, {self._ys[slot]})"
         
     def get_recent_input(self, seconds: int = 10) -> List[Dict[str, Any]]:
         """Get recent input events within specified seconds"""
-        current_time = time.time()
-        cutoff_time = current_time - seconds
+        events = []
+        with self._lock:
+            for slot in self._recent_slots(seconds).tolist():
+                event_type = int(self._types[slot])
+                event = {
+                    'type': EVENT_TYPES[event_type],
+                    'description': self._describe(slot),
+                    'timestamp': float(self._timestamps[slot])
+                }
+                if event_type == MOUSE_MOVE:
+                    event['x'] = int(self._xs[slot])
+                    event['y'] = int(self._ys[slot])
+                events.append(event)
+        return events
+        
+    def _type_counts(self, seconds: float) -> np.ndarray:
+        """Number of events of each type within the last seconds"""
+        with self._lock:
+            recent_types = self._types[self._recent_slots(seconds)]
+        return np.bincount(recent_types, minlength=len(EVENT_TYPES))
         
-        return [event for event in self.input_history if event['timestamp'] >= cutoff_time]
+    def get_counts(self, seconds: float = 10) -> InputCounts:
+        """Get key, mouse and total event counts within specified seconds"""
+        counts = self._type_counts(seconds)
+        key_count = int(counts[KEY_PRESS] + counts[KEY_RELEASE])
+        mouse_count = int(counts[MOUSE_PRESS:].sum())
+        return InputCounts(key_count, mouse_count, key_count + mouse_count, seconds)
         
     def get_input_patterns(self) -> Dict[str, Any]:
         """Analyze input patterns for behavior detection"""
-        if not self.input_history:
+        if not self._count:
             return {}
             
-        recent_events = self.get_recent_input(60)  # Last minute
+        # Count event types in the last minute
+        counts = self._type_counts(60)
+        event_counts = {EVENT_TYPES[event_type]: int(count)
+                        for event_type, count in enumerate(counts) if count}
         
-        # Count event types
-        event_counts = {}
-        for event in recent_events:
-            event_type = event['type']
-            event_counts[event_type] = event_counts.get(event_type, 0) + 1
-            
         # Detect rapid typing (high key press rate)
-        key_events = [e for e in recent_events if e['type'] in ['key_press', 'key_release']]
-        typing_rate = len(key_events) / 60  # events per second
+        typing_rate = int(counts[KEY_PRESS] + counts[KEY_RELEASE]) / 60  # events per second
         
         # Detect mouse activity
-        mouse_events = [e for e in recent_events if e['type'].startswith('mouse')]
-        mouse_activity = len(mouse_events) / 60
+        mouse_activity = int(counts[MOUSE_PRESS:].sum()) / 60
         
         return {
             'event_counts': event_counts,
             'typing_rate': typing_rate,
             'mouse_activity': mouse_activity,
-            'total_events': len(recent_events),
+            'total_events': int(counts.sum()),
             'is_active': typing_rate > 0.5 or mouse_activity > 0.1
         }
-
@@ -3,6 +3,7 @@ Process and window monitoring module
 """
 
 import time
+from collections import deque
 import psutil
 from typing import List, Dict, Any, Optional
 
@@ -14,41 +15,37 @@ try:
 except ImportError:
     WINDOWS_API_AVAILABLE = False
 
+# Process attributes collected on each enumeration
+PROCESS_ATTRS = ['pid', 'name', 'memory_percent', 'create_time']
+
 
 class ProcessMonitor:
     """Monitors running processes and active windows"""
     
     def __init__(self):
-        self.last_processes = {}
-        self.process_history = []
+        self.last_processes = []
+        self._last_pids = set()
         self.max_history = 50
+        self.process_history = deque(maxlen=self.max_history)
         
     def get_active_processes(self) -> List[Dict[str, Any]]:
         """Get list of currently running processes"""
         processes = []
         
         try:
-            for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent', 'create_time']):
+            # process_iter reads the attrs under proc.oneshot() and builds a
+            # fresh info dict per process, so it can be stored as is
+            for proc in psutil.process_iter(PROCESS_ATTRS):
                 try:
-                    proc_info = proc.info
-                    processes.append({
-                        'pid': proc_info['pid'],
-                        'name': proc_info['name'],
-                        'cpu_percent': proc_info['cpu_percent'],
-                        'memory_percent': proc_info['memory_percent'],
-                        'create_time': proc_info['create_time']
-                    })
+                    processes.append(proc.info)
                 except (psutil.NoSuchProcess, psutil.AccessDenied):
                     continue
                     
-            # Store in history
+            # Store in history, the deque drops the oldest entry
             self.process_history.append({
                 'processes': processes,
                 'timestamp': time.time()
             })
-            
-            if len(self.process_history) > self.max_history:
-                self.process_history.pop(0)
                 
         except Exception as e:
             print(f"Error getting processes: {e}")
@@ -97,28 +94,34 @@ class ProcessMonitor:
             print(f"Error getting active window: {e}")
             return None
             
-    def get_process_changes(self) -> Dict[str, Any]:
-        """Detect changes in running processes"""
-        current_processes = {p['pid']: p for p in self.get_active_processes()}
+    def get_process_changes(self, processes: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """Detect changes in running processes
+        
+        Pass the result of get_active_processes() to avoid enumerating the
+        process table a second time.
+        """
+        if processes is None:
+            processes = self.get_active_processes()
+        current_pids = {p['pid'] for p in processes}
+        
+        # Diff the PID sets, process dicts are only gathered for the delta
+        new_pids = current_pids - self._last_pids
+        terminated_pids = self._last_pids - current_pids
         
         # Find new processes
-        new_processes = []
-        for pid, proc in current_processes.items():
-            if pid not in self.last_processes:
-                new_processes.append(proc)
-                
+        new_processes = [p for p in processes if p['pid'] in new_pids] if new_pids else []
+        
         # Find terminated processes
-        terminated_processes = []
-        for pid, proc in self.last_processes.items():
-            if pid not in current_processes:
-                terminated_processes.append(proc)
-                
+        terminated_processes = ([p for p in self.last_processes if p['pid'] in terminated_pids]
+                                if terminated_pids else [])
+        
         # Update last processes
-        self.last_processes = current_processes.copy()
+        self.last_processes = processes
+        self._last_pids = current_pids
         
         return {
             'new_processes': new_processes,
             'terminated_processes': terminated_processes,
-            'total_processes': len(current_processes)
+            'total_processes': len(current_pids)
         }
 
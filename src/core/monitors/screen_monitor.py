@@ -2,7 +2,9 @@
 Screen capture and analysis module
 """
 
+import sys
 import time
+from collections import deque
 from typing import Optional, Dict, Any
 import numpy as np
 import cv2
@@ -20,52 +22,97 @@ try:
 except ImportError:
     MSS_AVAILABLE = False
 
+# Try to import Numba for the fused screenshot statistics kernel
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Ahead-of-time compiled kernels built by compile_kernels.py, these skip
+# the JIT warmup on the first frame
+try:
+    from vivi_kernels import screen_stats as _aot_screen_stats
+    AOT_KERNELS_AVAILABLE = True
+except ImportError:
+    AOT_KERNELS_AVAILABLE = False
+
+
+# Size of the grayscale thumbnails kept in history for change detection
+THUMBNAIL_SIZE = (256, 256)
+
+# A frozen app has no kernel source on disk for Numba to cache against
+_NUMBA_CACHE = not getattr(sys, 'frozen', False)
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=_NUMBA_CACHE)
+    def _screen_stats(rgb, gray):
+        """Convert RGB to gray in place and accumulate the sum and sum of
+        squares of the gray values in one pass"""
+        height, width = gray.shape
+        total = 0.0
+        total_sq = 0.0
+        for i in prange(height):
+            for j in range(width):
+                # Fixed-point BT.601 luma, weights sum to 256 and the added
+                # 128 rounds to nearest like cv2.cvtColor does
+                g = (int(rgb[i, j, 0]) * 77 + int(rgb[i, j, 1]) * 150 + int(rgb[i, j, 2]) * 29 + 128) >> 8
+                gray[i, j] = g
+                total += g
+                total_sq += g * g
+        return total, total_sq
+
+
+# Fused statistics kernel, preferring the ahead-of-time build
+if AOT_KERNELS_AVAILABLE:
+    _SCREEN_STATS = _aot_screen_stats
+elif NUMBA_AVAILABLE:
+    _SCREEN_STATS = _screen_stats
+else:
+    _SCREEN_STATS = None
+
 
 class ScreenMonitor:
     """Handles screen capture and basic analysis"""
     
     def __init__(self):
+        # Latest full-resolution frame, history only keeps gray thumbnails.
+        # With MSS this is a buffer that is overwritten by the next capture
         self.last_screenshot = None
-        self.screenshot_history = []
         self.max_history = 10
+        self.screenshot_history = deque(maxlen=self.max_history)
         
         # Initialize MSS if available
         if MSS_AVAILABLE:
             self.mss_instance = mss.mss()
+            self._monitor = self.mss_instance.monitors[0]
         else:
             self.mss_instance = None
+            self._monitor = None
+            
+        # RGB frame buffer reused across MSS captures
+        self._rgb_buf = None
         
     def capture_screen(self) -> Optional[Dict[str, Any]]:
         """Capture current screen and return analysis"""
         try:
             # Capture screenshot using available method
-            if PIL_AVAILABLE:
+            if MSS_AVAILABLE and self.mss_instance:
+                screenshot_np = self._grab_mss()
+            elif PIL_AVAILABLE:
                 screenshot = ImageGrab.grab()
                 screenshot_np = np.array(screenshot)
-            elif MSS_AVAILABLE and self.mss_instance:
-                # Use MSS for cross-platform screenshot
-                screenshot = self.mss_instance.grab(self.mss_instance.monitors[0])
-                screenshot_np = np.array(screenshot)
             else:
                 print("No screenshot library available")
                 return None
             
-            # Store in history
             self.last_screenshot = screenshot_np
-            self.screenshot_history.append({
-                'image': screenshot_np,
-                'timestamp': time.time()
-            })
             
-            # Keep only recent screenshots
-            if len(self.screenshot_history) > self.max_history:
-                self.screenshot_history.pop(0)
-                
-            # Basic analysis
+            # Basic analysis, also stores the frame thumbnail in history
             analysis = self._analyze_screenshot(screenshot_np)
             
             return {
-                'image': screenshot_np,
                 'analysis': analysis,
                 'timestamp': time.time()
             }
@@ -74,27 +121,53 @@ class ScreenMonitor:
             print(f"Error capturing screen: {e}")
             return None
             
-    def _analyze_screenshot(self, image: np.ndarray) -> Dict[str, Any]:
-        """Basic screenshot analysis"""
-        # Convert to grayscale for analysis
-        gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+    def _grab_mss(self) -> np.ndarray:
+        """Grab the screen with MSS into the reused RGB buffer"""
+        screenshot = self.mss_instance.grab(self._monitor)
+        height, width = screenshot.height, screenshot.width
         
-        # Calculate basic statistics
-        brightness = np.mean(gray)
-        contrast = np.std(gray)
+        if self._rgb_buf is None or self._rgb_buf.shape != (height, width, 3):
+            self._rgb_buf = np.empty((height, width, 3), dtype=np.uint8)
+            
+        # MSS returns raw BGRA, convert straight into the buffer
+        bgra = np.frombuffer(screenshot.raw, dtype=np.uint8).reshape(height, width, 4)
+        cv2.cvtColor(bgra, cv2.COLOR_BGRA2RGB, dst=self._rgb_buf)
+        return self._rgb_buf
         
-        # Detect if screen is mostly static (low change)
+    def _analyze_screenshot(self, image: np.ndarray) -> Dict[str, Any]:
+        """Basic screenshot analysis"""
+        if _SCREEN_STATS is not None and image.ndim == 3 and image.shape[2] == 3:
+            # Gray conversion and statistics in a single pass
+            gray = np.empty(image.shape[:2], dtype=np.uint8)
+            total, total_sq = _SCREEN_STATS(image, gray)
+            brightness = total / gray.size
+            contrast = np.sqrt(max(total_sq / gray.size - brightness * brightness, 0.0))
+        else:
+            # Convert to grayscale once for analysis
+            gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
+            
+            # Calculate basic statistics in a single pass
+            mean, stddev = cv2.meanStdDev(gray)
+            brightness = mean[0, 0]
+            contrast = stddev[0, 0]
+            
+        # Detect if screen is mostly static (low change) against the
+        # previous thumbnail
+        thumb = cv2.resize(gray, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
         change_detected = False
-        if len(self.screenshot_history) > 1:
-            prev_image = self.screenshot_history[-2]['image']
-            if prev_image.shape == image.shape:
-                diff = cv2.absdiff(gray, cv2.cvtColor(prev_image, cv2.COLOR_RGB2GRAY))
-                change_detected = np.mean(diff) > 10  # Threshold for change detection
-                
+        if self.screenshot_history:
+            diff = cv2.absdiff(thumb, self.screenshot_history[-1]['thumb'])
+            change_detected = cv2.mean(diff)[0] > 10  # Threshold for change detection
+            
+        # Store in history, the deque keeps only recent thumbnails
+        self.screenshot_history.append({
+            'thumb': thumb,
+            'timestamp': time.time()
+        })
+        
         return {
             'brightness': float(brightness),
             'contrast': float(contrast),
             'change_detected': change_detected,
             'dimensions': image.shape
         }
-
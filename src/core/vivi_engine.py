@@ -2,28 +2,78 @@
 Vivi Engine - Core AI assistant logic
 """
 
+import logging
 import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
 from typing import Optional, Dict, Any
 from PyQt6.QtCore import QObject, pyqtSignal
-from .monitors.screen_monitor import ScreenMonitor
-from .monitors.process_monitor import ProcessMonitor
-from .monitors.input_monitor import InputMonitor
-from .ai.analyzer import BehaviorAnalyzer
-from .ai.feedback_engine import FeedbackEngine
+from .frame import MonitorFrame
+
+log = logging.getLogger(__name__)
+log.addHandler(logging.NullHandler())
+
+# Static frames after which screen capture is skipped while input is idle
+STATIC_FRAMES_BEFORE_SKIP = 3
+
+# Main loop period in seconds. Each tick doubles it up to MAX_PERIOD once
+# input has been idle for IDLE_BACKOFF_AFTER seconds
+BASE_PERIOD = 1.0
+MAX_PERIOD = 8.0
+IDLE_BACKOFF_AFTER = 30.0
+
+# Tasks kept in the user's work list, adding more drops the oldest
+MAX_TASKS = 1000
+
+# Seconds between logged tracebacks of the same main loop exception type
+ERROR_LOG_INTERVAL = 30.0
+
+# Seconds between polls of each monitor, results are reused in between.
+# The loop ticks at most every BASE_PERIOD, so shorter intervals would not
+# be honoured. Input is not listed, its events arrive through callbacks
+MONITOR_INTERVALS = {"screen": 1.0, "processes": 3.0, "window": 1.0}
+
+# Monitors due within this many seconds of a tick are polled on that tick,
+# so wake-up jitter does not push them back by a whole period
+SCHEDULE_SLACK = 0.1
+
+# Feedback sent when the engine starts, stamped with the start time
+_WELCOME = {
+    "type": "welcome",
+    "message": "Welcome to Vivi! I'm now monitoring your activity.",
+    "priority": "low",
+}
 
 
 class ViviEngine(QObject):
     """Main Vivi AI assistant engine"""
 
-    # Signal emitted when feedback is generated
-    feedback_generated = pyqtSignal(dict)
+    # Signal emitted when feedback is generated, carrying a read-only
+    # mapping so it is passed by reference rather than converted to a QVariant
+    feedback_generated = pyqtSignal(object)
+    state_changed = pyqtSignal()
 
     def __init__(self):
         super().__init__()
         self.running = False
         self.thread = None
 
+        # Stop event of the current main loop, set to wake and end it early
+        self._wake = threading.Event()
+
+        # Monotonic time each main loop exception type was last logged
+        self._last_err_ts = {}
+
+        # Monitors and AI components pull in mss, cv2, pynput and numba, so
+        # they are imported here rather than when this module is loaded
+        from .monitors.screen_monitor import ScreenMonitor
+        from .monitors.process_monitor import ProcessMonitor
+        from .monitors.input_monitor import InputMonitor
+        from .ai.analyzer import BehaviorAnalyzer
+        from .ai.feedback_engine import FeedbackEngine
+
         # Initialize monitors
         self.screen_monitor = ScreenMonitor()
         self.process_monitor = ProcessMonitor()
@@ -31,104 +81,200 @@ class ViviEngine(QObject):
 
         # Initialize AI components
         self.analyzer = BehaviorAnalyzer()
+
+        # Compile the analyzer's JIT kernel now rather than on the first tick
+        self.analyzer._warmup()
         self.feedback_engine = FeedbackEngine()
 
         # User context
-        self.user_tasks = []
+        self.user_tasks = deque(maxlen=MAX_TASKS)
+        self._tasks_lock = threading.Lock()
+
         self.current_context = {}
 
+        # Per-monitor polling schedule and the last result of each monitor
+        self._monitor_polls = {
+            "screen": self._collect_screen,
+            "processes": self.process_monitor.get_active_processes,
+            "window": self.process_monitor.get_active_window,
+        }
+        self._intervals = dict(MONITOR_INTERVALS)
+        self._next_due = dict.fromkeys(self._intervals, 0.0)
+        self._last_results = dict.fromkeys(self._intervals)
+
+        # Last screen result, reused while the user is idle and the screen static
+        self._last_screen = None
+        self._consecutive_static_frames = 0
+
+        # Adaptive main loop period
+        self._period = BASE_PERIOD
+        self._last_input_activity = time.monotonic()
+
     def start(self):
         """Start the Vivi engine"""
         if self.running:
             return
 
+        # Each loop gets its own stop event and worker pool. A previous loop
+        # still blocked in its last tick then ends on its own, so start()
+        # never has to wait for it
         self.running = True
+        self._wake = threading.Event()
+        pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="vivi-mon")
+        self._period = BASE_PERIOD
+        self._last_input_activity = time.monotonic()
 
         # Start input monitoring
-        print("Starting input monitoring...")
+        log.debug("Starting input monitoring...")
         self.input_monitor.start_monitoring()
-        print("Input monitoring started")
+        log.debug("Input monitoring started")
 
-        print("Starting main loop thread...")
-        self.thread = threading.Thread(target=self._main_loop, daemon=True)
+        log.debug("Starting main loop thread...")
+        self.thread = threading.Thread(
+            target=self._main_loop, args=(self._wake, pool), daemon=True
+        )
         self.thread.start()
-        print("Main loop thread started")
+        log.debug("Main loop thread started")
 
         # Send a welcome message
-        welcome_feedback = {
-            "type": "welcome",
-            "message": "Welcome to Vivi! I'm now monitoring your activity.",
-            "priority": "low",
-            "timestamp": time.time(),
-        }
-        self._deliver_feedback(welcome_feedback)
+        self._deliver_feedback({**_WELCOME, "timestamp": time.time()})
+        self.state_changed.emit()
 
     def stop(self):
         """Stop the Vivi engine"""
         self.running = False
+        self._wake.set()
 
         # Stop input monitoring
         self.input_monitor.stop_monitoring()
 
+        # The loop shuts down its own pool once it exits
         if self.thread:
-            self.thread.join()
+            self.thread.join(timeout=2)
 
-    def _main_loop(self):
-        """Main processing loop"""
-        print("Main loop started")
+        self.state_changed.emit()
+
+    def _main_loop(self, stop: threading.Event, pool: ThreadPoolExecutor):
+        """Main processing loop, runs until its own stop event is set"""
+        log.debug("Main loop started")
         loop_count = 0
-        while self.running:
-            try:
-                loop_count += 1
-                print(f"Main loop iteration {loop_count}")
-
-                # Collect data from all monitors
-                data = self._collect_data()
-                print(f"Data collected: {list(data.keys())}")
-
-                # Analyze behavior
-                analysis = self.analyzer.analyze(data)
-                print(
-                    f"Analysis completed, needs_feedback: {analysis.get('needs_feedback')}"
-                )
-
-                # Generate feedback if needed
-                if analysis.get("needs_feedback"):
-                    print("Generating feedback...")
-                    feedback = self.feedback_engine.generate_feedback(analysis)
-                    self._deliver_feedback(feedback)
-                else:
-                    print("No feedback needed")
-
-                time.sleep(1)  # Process every second
-
-            except Exception as e:
-                print(f"Error in main loop: {e}")
-                import traceback
-
-                traceback.print_exc()
-                time.sleep(5)  # Wait before retrying
-
-    def _collect_data(self) -> Dict[str, Any]:
+        next_tick = time.monotonic()
+        try:
+            while not stop.is_set():
+                try:
+                    loop_count += 1
+                    log.debug("Main loop iteration %d", loop_count)
+
+                    # Collect data from all monitors
+                    data = self._collect_data(pool)
+                    log.debug("Data collected at %.3f", data.timestamp)
+
+                    # Analyze behavior
+                    analysis = self.analyzer.analyze(data)
+                    needs_feedback = analysis.get("needs_feedback")
+                    log.debug("Analysis completed, needs_feedback: %s", needs_feedback)
+
+                    # A loop stopped during its tick ends without feedback
+                    if stop.is_set():
+                        break
+
+                    # Generate feedback if needed
+                    if needs_feedback:
+                        log.debug("Generating feedback...")
+                        feedback = self.feedback_engine.generate_feedback(analysis)
+                        self._deliver_feedback(feedback)
+                    else:
+                        log.debug("No feedback needed")
+
+                    # Wait until the next tick on a fixed cadence, so the
+                    # period does not drift by the time spent working
+                    self._adapt_period()
+                    next_tick = max(next_tick + self._period, time.monotonic())
+                    stop.wait(max(0.0, next_tick - time.monotonic()))
+
+                except Exception as e:
+                    # Log each exception type at most once per interval so an
+                    # error storm does not flood the log with tracebacks
+                    now = time.monotonic()
+                    err_type = type(e)
+                    last = self._last_err_ts.get(err_type)
+                    if last is None or now - last >= ERROR_LOG_INTERVAL:
+                        log.exception("Error in main loop: %s", e)
+                        self._last_err_ts[err_type] = now
+                    stop.wait(5)  # Wait before retrying
+                    next_tick = time.monotonic()
+        finally:
+            pool.shutdown(wait=False)
+            log.debug("Main loop stopped")
+
+    def _adapt_period(self):
+        """Back off the loop period while the user is idle"""
+        idle = time.monotonic() - self._last_input_activity > IDLE_BACKOFF_AFTER
+        if idle:
+            self._period = min(self._period * 2, MAX_PERIOD)
+        else:
+            self._period = BASE_PERIOD
+
+    def _collect_data(self, pool: ThreadPoolExecutor) -> MonitorFrame:
         """Collect data from all monitors"""
-        return {
-            "screen": self.screen_monitor.capture_screen(),
-            "processes": self.process_monitor.get_active_processes(),
-            "window": self.process_monitor.get_active_window(),
-            "input": self.input_monitor.get_recent_input(),
-            "timestamp": time.time(),
-        }
+        timestamp = time.time()
+        now = time.monotonic()
+
+        # Screen capture and process/window lookups block in the OS, run
+        # the ones that are due concurrently so a tick takes as long as the
+        # slowest one. The others keep their last result
+        futures = {}
+        for name, poll in self._monitor_polls.items():
+            if now + SCHEDULE_SLACK >= self._next_due[name]:
+                futures[name] = pool.submit(poll)
+                self._next_due[name] = now + self._intervals[name]
+        results = self._last_results
+        for name, future in futures.items():
+            results[name] = future.result()
+
+        return MonitorFrame(
+            screen=results["screen"],
+            processes=results["processes"],
+            window=results["window"],
+            input=self.input_monitor.get_counts(),
+            timestamp=timestamp,
+        )
+
+    def _collect_screen(self) -> Optional[Dict[str, Any]]:
+        """Capture the screen, or reuse the last result when nothing moves"""
+        input_active = self.input_monitor.get_input_patterns().get("is_active", False)
+        if input_active:
+            self._consecutive_static_frames = 0
+            self._last_input_activity = time.monotonic()
+        elif (
+            self._last_screen is not None
+            and self._consecutive_static_frames > STATIC_FRAMES_BEFORE_SKIP
+        ):
+            # Idle user and static screen, skip the capture entirely
+            return self._last_screen
+
+        screen = self.screen_monitor.capture_screen()
+        if screen and not screen["analysis"]["change_detected"]:
+            self._consecutive_static_frames += 1
+        else:
+            self._consecutive_static_frames = 0
+        self._last_screen = screen
+        return screen
 
     def _deliver_feedback(self, feedback: Dict[str, Any]):
         """Deliver feedback to user"""
-        print(f"Vivi Feedback: {feedback}")
-        # Emit signal to GUI
-        self.feedback_generated.emit(feedback)
+        log.debug("Vivi Feedback: %r", feedback)
+        # Emit signal to GUI, if one is connected (e.g. not in console mode)
+        if self.receivers(self.feedback_generated) > 0:
+            self.feedback_generated.emit(MappingProxyType(feedback))
 
     def add_task(self, task: str):
-        """Add a task to user's work list"""
-        self.user_tasks.append(task)
+        """Add a task to user's work list, keeping the last MAX_TASKS"""
+        with self._tasks_lock:
+            self.user_tasks.append(task)
+        self.state_changed.emit()
 
-    def get_tasks(self) -> list:
-        """Get current user tasks"""
-        return self.user_tasks.copy()
+    def get_tasks(self) -> tuple:
+        """Get a snapshot of current user tasks"""
+        with self._tasks_lock:
+            return tuple(self.user_tasks)
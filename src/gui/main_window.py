@@ -3,11 +3,40 @@ Main GUI window for Vivi
 """
 
 import time
+from typing import Mapping
 from PyQt6.QtWidgets import (QMainWindow, QVBoxLayout, QHBoxLayout, 
                              QWidget, QLabel, QPushButton, QTextEdit, 
                              QListWidget, QSplitter, QStatusBar)
-from PyQt6.QtCore import QTimer, pyqtSignal
-from PyQt6.QtGui import QFont
+from PyQt6.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QFont, QTextCursor
+
+# Lines kept in the feedback display, three per feedback message
+MAX_FEEDBACK_LINES = 600
+
+_DIVIDER = "-" * 50 + "\n"
+
+
+class _SnapshotSignals(QObject):
+    """Signals of the engine snapshot task"""
+    
+    # Sequence number, tasks tuple and engine running state
+    ready = pyqtSignal(int, object, bool)
+
+
+class _SnapshotTask(QRunnable):
+    """Reads engine tasks and state on a pool thread"""
+    
+    def __init__(self, engine, signals: _SnapshotSignals, seq: int):
+        super().__init__()
+        self.engine = engine
+        self.signals = signals
+        self.seq = seq
+        
+    def run(self):
+        try:
+            self.signals.ready.emit(self.seq, self.engine.get_tasks(), self.engine.running)
+        except Exception as e:
+            print(f"Error reading engine state: {e}")
 
 
 class MainWindow(QMainWindow):
@@ -16,10 +45,23 @@ class MainWindow(QMainWindow):
     def __init__(self, engine):
         super().__init__()
         self.engine = engine
+        self._last_tasks = ()
+        self._last_status = None
+        
+        # Snapshots are taken off the GUI thread, the sequence numbers let
+        # a snapshot that finishes late be dropped in favour of a newer one
+        self._snapshot_signals = _SnapshotSignals()
+        self._snapshot_signals.ready.connect(self._apply_snapshot)
+        self._snapshot_seq = 0
+        self._applied_seq = 0
         self.init_ui()
         
         # Connect engine signals
-        self.engine.feedback_generated.connect(self.display_feedback)
+        # Feedback is emitted from the engine's worker thread
+        self.engine.feedback_generated.connect(self.display_feedback,
+                                               Qt.ConnectionType.QueuedConnection)
+        self.engine.state_changed.connect(self.update_display)
+        self.update_display()
         
     def init_ui(self):
         """Initialize the user interface"""
@@ -53,11 +95,6 @@ class MainWindow(QMainWindow):
         self.setStatusBar(self.status_bar)
         self.status_bar.showMessage("Vivi is running...")
         
-        # Setup update timer
-        self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self.update_display)
-        self.update_timer.start(1000)  # Update every second
-        
     def _create_left_panel(self) -> QWidget:
         """Create the left control panel"""
         panel = QWidget()
@@ -128,7 +165,6 @@ class MainWindow(QMainWindow):
         task_text = self.task_input.toPlainText().strip()
         if task_text:
             self.engine.add_task(task_text)
-            self.task_list.addItem(task_text)
             self.task_input.clear()
             
     def toggle_monitoring(self):
@@ -143,28 +179,41 @@ class MainWindow(QMainWindow):
             self.status_bar.showMessage("Vivi is running...")
             
     def update_display(self):
-        """Update the display with current information"""
+        """Request a fresh engine snapshot for the display"""
+        self._snapshot_seq += 1
+        QThreadPool.globalInstance().start(
+            _SnapshotTask(self.engine, self._snapshot_signals, self._snapshot_seq))
+        
+    def _apply_snapshot(self, seq: int, current_tasks: tuple, running: bool):
+        """Update the display with an engine snapshot"""
+        if seq < self._applied_seq:
+            return
+        self._applied_seq = seq
+        
         try:
-            # Update task list
-            current_tasks = self.engine.get_tasks()
-            self.task_list.clear()
-            for task in current_tasks:
-                self.task_list.addItem(task)
+            # Update task list only when the tasks changed
+            if current_tasks != self._last_tasks:
+                self.task_list.clear()
+                self.task_list.addItems(current_tasks)
+                self._last_tasks = current_tasks
                 
-            # Update status display
-            status_text = f"Engine Running: {self.engine.running}\n"
-            status_text += f"Active Tasks: {len(current_tasks)}\n"
-            status_text += f"Screen Monitor: Active\n"
-            status_text += f"Process Monitor: Active\n"
-            status_text += f"Input Monitor: Active"
-            
-            self.status_display.setPlainText(status_text)
+            # Update status display only when its inputs changed
+            status = (running, len(current_tasks))
+            if status != self._last_status:
+                status_text = f"Engine Running: {status[0]}\n"
+                status_text += f"Active Tasks: {status[1]}\n"
+                status_text += f"Screen Monitor: Active\n"
+                status_text += f"Process Monitor: Active\n"
+                status_text += f"Input Monitor: Active"
+                
+                self.status_display.setPlainText(status_text)
+                self._last_status = status
             
         except Exception as e:
             print(f"Error updating display: {e}")
             # Don't crash the GUI, just log the error
             
-    def display_feedback(self, feedback: dict):
+    def display_feedback(self, feedback: Mapping):
         """Display AI feedback in the feedback section"""
         try:
             message = feedback.get('message', 'No message')
@@ -173,13 +222,19 @@ class MainWindow(QMainWindow):
             
             # Format the feedback message
             timestamp = time.strftime("%H:%M:%S")
-            formatted_message = f"[{timestamp}] {message}\n"
-            formatted_message += f"Type: {feedback_type} | Priority: {priority}\n"
-            formatted_message += "-" * 50 + "\n"
+            formatted_message = (f"[{timestamp}] {message}\n"
+                                 f"Type: {feedback_type} | Priority: {priority}\n"
+                                 f"{_DIVIDER}")
+            
+            # Prepend to feedback display without re-setting the whole text
+            document = self.feedback_display.document()
+            QTextCursor(document).insertText(formatted_message)
             
-            # Append to feedback display
-            current_text = self.feedback_display.toPlainText()
-            self.feedback_display.setPlainText(formatted_message + current_text)
+            # Drop the oldest lines at the bottom
+            if document.blockCount() > MAX_FEEDBACK_LINES:
+                cursor = QTextCursor(document.findBlockByNumber(MAX_FEEDBACK_LINES))
+                cursor.movePosition(QTextCursor.MoveOperation.End, QTextCursor.MoveMode.KeepAnchor)
+                cursor.removeSelectedText()
             
         except Exception as e:
             print(f"Error displaying feedback: {e}")
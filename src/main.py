@@ -6,18 +6,27 @@ Main application entry point
 
 import sys
 import os
-from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import QTimer
+import logging
 
-from .gui.main_window import MainWindow
 from .core.vivi_engine import ViviEngine
 
 
 def main():
     """Main application entry point"""
+    # Warnings and main loop errors are always shown, VIVI_DEBUG=1 also
+    # enables the engine's per-iteration debug logging. Only Vivi's own
+    # loggers go to DEBUG, third-party libraries like Numba stay quiet
+    logging.basicConfig(level=logging.WARNING)
+    if os.environ.get("VIVI_DEBUG") == "1":
+        logging.getLogger(__package__).setLevel(logging.DEBUG)
+        
     try:
         print("Starting Vivi application...")
         
+        # Qt widgets are only needed by the GUI, not by console mode
+        from PyQt6.QtWidgets import QApplication
+        from .gui.main_window import MainWindow
+        
         # Check if we can create QApplication
         print("Creating QApplication...")
         app = QApplication(sys.argv)
@@ -3,111 +3,204 @@
 Simple test script for Vivi components
 """
 
+import dataclasses
+import functools
+import io
 import sys
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "src"))
+# Components are imported inside each test, so a single test only pays for
+# its own dependencies (mss, psutil, pynput, numba). They are imported as
+# src.core..., the name the app uses, since Numba's on-disk kernel cache
+# records the name of the module each kernel came from
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
 
-from core.monitors.screen_monitor import ScreenMonitor
-from core.monitors.process_monitor import ProcessMonitor
-from core.monitors.input_monitor import InputMonitor
-from core.ai.analyzer import BehaviorAnalyzer
-from core.ai.feedback_engine import FeedbackEngine
 
+@functools.lru_cache(maxsize=None)
+def _get(cls):
+    """Shared instance of a component, constructed on first use"""
+    return cls()
 
-def test_screen_monitor():
+
+def _drive(analyzer, frame, n):
+    """Seconds per analyze() call, averaged over n calls on the same frame"""
+    analyze = analyzer.analyze
+    start = time.perf_counter()
+    for _ in range(n):
+        analyze(frame)
+    return (time.perf_counter() - start) / n
+
+
+def _mock_frame():
+    """Monitor frame of a coding session with two recent key presses"""
+    from src.core.frame import InputCounts, MonitorFrame
+
+    return MonitorFrame(
+        screen={
+            "analysis": {
+                "brightness": 150,
+                "contrast": 50,
+                "change_detected": True,
+                "dimensions": (1920, 1080, 3),
+            }
+        },
+        processes=[
+            {"name": "code.exe", "pid": 1234},
+            {"name": "chrome.exe", "pid": 5678},
+        ],
+        window={"title": "Visual Studio Code", "process_name": "code.exe"},
+        # Two key presses in the last 10 seconds, as InputMonitor.get_counts()
+        # reports them to the engine
+        input=InputCounts(key_count=2, mouse_count=0, total=2, seconds=10.0),
+        timestamp=1234567891,
+    )
+
+
+def test_screen_monitor(out=None):
     """Test screen monitoring functionality"""
-    print("🖥️  Testing Screen Monitor...")
-    monitor = ScreenMonitor()
+    from src.core.monitors.screen_monitor import ScreenMonitor
+
+    print("🖥️  Testing Screen Monitor...", file=out)
+    monitor = _get(ScreenMonitor)
 
     # Test screen capture
     result = monitor.capture_screen()
     if result:
-        print(f"✅ Screen captured successfully")
-        print(f"   Dimensions: {result['analysis']['dimensions']}")
-        print(f"   Brightness: {result['analysis']['brightness']:.1f}")
-        print(f"   Contrast: {result['analysis']['contrast']:.1f}")
+        print(f"✅ Screen captured successfully", file=out)
+        print(f"   Dimensions: {result['analysis']['dimensions']}", file=out)
+        print(f"   Brightness: {result['analysis']['brightness']:.1f}", file=out)
+        print(f"   Contrast: {result['analysis']['contrast']:.1f}", file=out)
     else:
-        print("❌ Screen capture failed")
-    print()
+        print("❌ Screen capture failed", file=out)
+    print(file=out)
 
 
-def test_process_monitor():
+def test_process_monitor(out=None):
     """Test process monitoring functionality"""
-    print("⚙️  Testing Process Monitor...")
-    monitor = ProcessMonitor()
+    from src.core.monitors.process_monitor import ProcessMonitor
+
+    print("⚙️  Testing Process Monitor...", file=out)
+    monitor = _get(ProcessMonitor)
 
     # Test process listing
     processes = monitor.get_active_processes()
-    print(f"✅ Found {len(processes)} running processes")
+    print(f"✅ Found {len(processes)} running processes", file=out)
 
     # Show first few processes
     for i, proc in enumerate(processes[:5]):
-        print(f"   {i+1}. {proc['name']} (PID: {proc['pid']})")
+        print(f"   {i+1}. {proc['name']} (PID: {proc['pid']})", file=out)
 
     # Test active window
     window = monitor.get_active_window()
     if window:
-        print(f"✅ Active window: {window['title']}")
-        print(f"   Process: {window['process_name']}")
+        print(f"✅ Active window: {window['title']}", file=out)
+        print(f"   Process: {window['process_name']}", file=out)
     else:
-        print("❌ Could not get active window")
-    print()
+        print("❌ Could not get active window", file=out)
+    print(file=out)
 
 
-def test_input_monitor():
+def test_input_monitor(out=None):
     """Test input monitoring functionality"""
-    print("⌨️  Testing Input Monitor...")
-    monitor = InputMonitor()
+    from src.core.monitors.input_monitor import InputMonitor
+
+    print("⌨️  Testing Input Monitor...", file=out)
+    monitor = _get(InputMonitor)
 
     # Test input patterns (without starting monitoring)
     patterns = monitor.get_input_patterns()
-    print(f"✅ Input patterns analyzed")
-    print(f"   Active: {patterns.get('input_active', False)}")
-    print(f"   Typing rate: {patterns.get('typing_rate', 0):.2f} events/sec")
-    print()
+    print(f"✅ Input patterns analyzed", file=out)
+    print(f"   Active: {patterns.get('input_active', False)}", file=out)
+    print(f"   Typing rate: {patterns.get('typing_rate', 0):.2f} events/sec", file=out)
+    print(file=out)
 
 
-def test_analyzer():
+def test_analyzer(out=None):
     """Test behavior analyzer"""
-    print("🧠 Testing Behavior Analyzer...")
-    analyzer = BehaviorAnalyzer()
+    import numpy as np
+    from src.core.ai.analyzer import BehaviorAnalyzer
+
+    print("🧠 Testing Behavior Analyzer...", file=out)
+    analyzer = _get(BehaviorAnalyzer)
 
     # Create mock data
-    mock_data = {
-        "screen": {
-            "analysis": {
-                "brightness": 150,
-                "contrast": 50,
-                "change_detected": True,
-                "dimensions": (1920, 1080, 3),
-            }
+    mock_data = _mock_frame()
+
+    # Analyze the data
+    analysis = analyzer.analyze(mock_data)
+    assert analysis["input_active"] and analysis["total_input_events"] == 2
+    print(f"✅ Analysis completed", file=out)
+    print(f"   Focus score: {analysis['focus_score']:.2f}", file=out)
+    print(f"   Needs feedback: {analysis['needs_feedback']}", file=out)
+    print(
+        f"   Distraction detected: {analysis.get('distraction_detected', False)}",
+        file=out,
+    )
+    print(
+        f"   Productivity detected: {analysis.get('productivity_detected', False)}",
+        file=out,
+    )
+
+    # The same key presses as parallel event arrays and as event dicts
+    for events in (
+        {
+            "types": np.array(["key_press", "key_press"], dtype="U16"),
+            "descriptions": np.array(["a", "b"], dtype="U16"),
+            "timestamps": np.array([1234567890, 1234567891], dtype=np.int64),
         },
-        "processes": [
-            {"name": "code.exe", "pid": 1234},
-            {"name": "chrome.exe", "pid": 5678},
-        ],
-        "window": {"title": "Visual Studio Code", "process_name": "code.exe"},
-        "input": [
+        [
             {"type": "key_press", "description": "a", "timestamp": 1234567890},
             {"type": "key_press", "description": "b", "timestamp": 1234567891},
         ],
-    }
+    ):
+        other = analyzer.analyze(dataclasses.replace(mock_data, input=events))
+        assert other["input_active"] and other["total_input_events"] == 2
+        assert other["focus_score"] == analysis["focus_score"]
+    print("✅ Input counts, event arrays and event dicts agree", file=out)
+    print(file=out)
 
-    # Analyze the data
+
+def test_analyzer_timing(out=None):
+    """Time the behavior analyzer on single frames and on a batch"""
+    import numpy as np
+    from src.core.ai.analyzer import BehaviorAnalyzer
+
+    print("⏱️ Timing Behavior Analyzer...", file=out)
+    analyzer = _get(BehaviorAnalyzer)
+    mock_data = _mock_frame()
     analysis = analyzer.analyze(mock_data)
-    print(f"✅ Analysis completed")
-    print(f"   Focus score: {analysis['focus_score']:.2f}")
-    print(f"   Needs feedback: {analysis['needs_feedback']}")
-    print(f"   Distraction detected: {analysis.get('distraction_detected', False)}")
-    print(f"   Productivity detected: {analysis.get('productivity_detected', False)}")
-    print()
+
+    per_call = _drive(analyzer, mock_data, 10_000)
+    print(f"   analyze(): {per_call * 1e6:.1f} µs per call", file=out)
+
+    # Score a batch of the same frame, built outside the timed region
+    n = 10_000
+    brightness = np.full(n, 150.0, dtype=np.float32)
+    change_detected = np.ones(n, dtype=bool)
+    productivity = np.full(n, analysis["productivity_detected"])
+    distraction = np.full(n, analysis["distraction_detected"])
+    input_active = np.ones(n, dtype=bool)
+
+    start = time.perf_counter()
+    scores = analyzer.analyze_batch(
+        brightness, change_detected, productivity, distraction, input_active
+    )
+    elapsed = time.perf_counter() - start
+    assert np.all(scores == analysis["focus_score"])
+    print(f"✅ Batch of {n} frames scored in {elapsed * 1e3:.2f} ms", file=out)
+    print(file=out)
 
 
-def test_feedback_engine():
+def test_feedback_engine(out=None):
     """Test feedback engine"""
-    print("💬 Testing Feedback Engine...")
-    engine = FeedbackEngine()
+    from src.core.ai.feedback_engine import FeedbackEngine
+
+    print("💬 Testing Feedback Engine...", file=out)
+    engine = _get(FeedbackEngine)
 
     # Create mock analysis
     mock_analysis = {
@@ -119,34 +212,67 @@ def test_feedback_engine():
 
     # Generate feedback
     feedback = engine.generate_feedback(mock_analysis)
-    print(f"✅ Feedback generated")
-    print(f"   Type: {feedback['type']}")
-    print(f"   Priority: {feedback['priority']}")
-    print(f"   Message: {feedback['message']}")
-    print()
+    print(f"✅ Feedback generated", file=out)
+    print(f"   Type: {feedback['type']}", file=out)
+    print(f"   Priority: {feedback['priority']}", file=out)
+    print(f"   Message: {feedback['message']}", file=out)
+    print(file=out)
 
 
 def main():
     """Run all tests"""
-    print("🧪 Running Vivi Component Tests")
-    print("=" * 50)
-
-    try:
-        test_screen_monitor()
-        test_process_monitor()
-        test_input_monitor()
-        test_analyzer()
-        test_feedback_engine()
-
-        print("🎉 All tests completed successfully!")
-        print("\n💡 Note: Some features require Windows-specific libraries.")
+    # The whole report is written to stdout in a single call at the end
+    report = io.StringIO()
+    print("🧪 Running Vivi Component Tests", file=report)
+    print("=" * 50, file=report)
+
+    # The tests are independent and mostly wait on the OS, so run them
+    # concurrently and print each one's buffered output in order
+    concurrent = [
+        test_screen_monitor,
+        test_process_monitor,
+        test_input_monitor,
+        test_analyzer,
+        test_feedback_engine,
+    ]
+    # Timings run one at a time afterwards, without other tests holding the GIL
+    timed = [test_analyzer_timing]
+    tests = concurrent + timed
+    buffers = [io.StringIO() for _ in tests]
+    runs = list(zip(tests, buffers))
+    with ThreadPoolExecutor(max_workers=len(concurrent)) as executor:
+        futures = [executor.submit(fn, buf) for fn, buf in runs[: len(concurrent)]]
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        futures += [executor.submit(fn, buf) for fn, buf in runs[len(concurrent) :]]
+
+    # Each test is reported on its own, so one failure does not hide the rest
+    failed = 0
+    for fn, future, buf in zip(tests, futures, buffers):
+        report.write(buf.getvalue())
+        e = future.exception()
+        if e is not None:
+            failed += 1
+            print(f"❌ {fn.__name__}: {e}", file=report)
+            print(file=report)
+
+    if failed:
+        print(f"❌ {failed} of {len(tests)} tests failed", file=report)
         print(
-            "   Make sure to install all requirements: pip install -r requirements.txt"
+            "   This might be due to missing dependencies or platform compatibility.",
+            file=report,
         )
+    else:
+        print("🎉 All tests completed successfully!", file=report)
+    print(
+        "\n💡 Note: Some features require Windows-specific libraries.",
+        file=report,
+    )
+    print(
+        "   Make sure to install all requirements: pip install -r requirements.txt",
+        file=report,
+    )
 
-    except Exception as e:
-        print(f"❌ Test failed with error: {e}")
-        print("   This might be due to missing dependencies or platform compatibility.")
+    sys.stdout.write(report.getvalue())
 
 
 if __name__ == "__main__":